@@ -1,13 +1,21 @@
 import logging
-from fastapi import APIRouter, HTTPException, Body, BackgroundTasks
+import orjson
+from fastapi import APIRouter, HTTPException, BackgroundTasks, Response
 from schemas.test_case import JourneyRequest
-from services import agent_service
-import httpx
+from services import agent_service, discovery_service
+from services.http_client import get_http_client
 from core.config import settings
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+@router.post("/discovery-cache/purge")
+async def purge_discovery_cache_endpoint():
+    """Clears cached UI blueprints so the next journey re-crawls the target."""
+    discovery_service.purge_blueprint_cache()
+    return {"status": "purged"}
+
+
 @router.post("/start-test-journey")
 async def start_test_journey_endpoint(
     request: JourneyRequest,
@@ -30,13 +38,14 @@ async def start_test_journey_endpoint(
             "parameters": parameters_dict # Use the converted dictionary
         }
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(f"{settings.REPORTING_SERVICE_URL}/results", json=initial_payload)
-            response.raise_for_status()
-            new_run_record = response.json()
-            db_run_id = new_run_record.get("id")
-            if not db_run_id:
-                raise HTTPException(status_code=500, detail="Failed to create initial run record.")
+        client = get_http_client()
+        response = await client.post(f"{settings.REPORTING_SERVICE_URL}/results", json=initial_payload)
+        response.raise_for_status()
+        initial_record_bytes = response.content
+        new_run_record = orjson.loads(initial_record_bytes)
+        db_run_id = new_run_record.get("id")
+        if not db_run_id:
+            raise HTTPException(status_code=500, detail="Failed to create initial run record.")
 
     except Exception as e:
         logger.error(f"Could not create initial test record: {e}", exc_info=True)
@@ -48,5 +57,7 @@ async def start_test_journey_endpoint(
     
     background_tasks.add_task(agent_service.run_agent_journey, journey_request_data)
 
-    # 3. Return the initial record immediately to the frontend
-    return new_run_record
\ No newline at end of file
+    # 3. Return the initial record immediately to the frontend. The record is
+    # already serialized by the reporting service, so pass the bytes straight
+    # through instead of running them back through the response encoder.
+    return Response(content=initial_record_bytes, media_type="application/json")
\ No newline at end of file
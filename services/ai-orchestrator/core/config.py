@@ -1,8 +1,10 @@
 """Core configuration module for the AI Orchestrator service."""
 
-import os
+from functools import lru_cache
+
 from dotenv import load_dotenv
-from pydantic_settings import BaseSettings
+from pydantic import Field, model_validator
+from pydantic_settings import BaseSettings, SettingsConfigDict
 
 load_dotenv()
 
@@ -10,36 +12,54 @@ load_dotenv()
 class Settings(BaseSettings):
     """
     Pydantic-based settings management for the application.
-    Reads environment variables and provides them as typed attributes.
+    Reads environment variables once and provides them as typed attributes;
+    the Docker service URLs are resolved inside the model so no caller ever
+    mutates a live settings instance.
     """
 
+    model_config = SettingsConfigDict(case_sensitive=True)
+
     # AI Model Configuration
-    GOOGLE_API_KEY: str = os.getenv("GOOGLE_API_KEY", "")
-    GEMINI_MODEL_NAME: str = os.getenv("GEMINI_MODEL_NAME", "")
-    GEMINI_TEMPERATURE: float = os.getenv("GEMINI_TEMPERATURE", "0.0")
+    GOOGLE_API_KEY: str = ""
+    GEMINI_MODEL_NAME: str = ""
+    GEMINI_TEMPERATURE: float = 0.0
 
     # Service URLs
-    DISCOVERY_SERVICE_URL: str = os.getenv("DISCOVERY_SERVICE_URL")
-    EXECUTION_AGENT_URL: str = os.getenv("EXECUTION_AGENT_URL")
-    REPORTING_SERVICE_URL: str = os.getenv("REPORTING_SERVICE_URL")
+    DISCOVERY_SERVICE_URL: str = "http://localhost:8001/discover"
+    EXECUTION_AGENT_URL: str = "http://localhost:8004/execute-step"
+    REPORTING_SERVICE_URL: str = "http://localhost:8002"
+
+    # RabbitMQ Configuration
+    RABBITMQ_HOST: str = "localhost"
+    RABBITMQ_DEFAULT_USER: str = "guest"
+    RABBITMQ_DEFAULT_PASS: str = "guest"
+    RABBITMQ_QUEUE: str = "test_generation_queue"
+    # Bounded prefetch for any consumer on this channel; prefetch=0 would let
+    # the broker push the whole backlog at one consumer.
+    RABBITMQ_PREFETCH: int = 100
 
     # CORS Configuration
     ALLOWED_ORIGINS: list[str] = ["http://localhost:3000"]
 
     # Environment Configuration
-    IS_DOCKER: bool = os.environ.get("DOCKER_ENV") == "true"
+    IS_DOCKER: bool = Field(default=False, validation_alias="DOCKER_ENV")
 
-    class Config:
-        """Pydantic configuration for environment variable loading."""
+    @model_validator(mode="after")
+    def _resolve_docker_urls(self) -> "Settings":
+        """Points peer-service URLs at the compose network inside Docker."""
+        if self.IS_DOCKER:
+            self.RABBITMQ_HOST = "rabbitmq"
+            self.DISCOVERY_SERVICE_URL = "http://discovery-service:8001/discover"
+            self.EXECUTION_AGENT_URL = "http://execution-agent:8004/execute-step"
+            self.REPORTING_SERVICE_URL = "http://reporting-service:8002"
+        return self
 
-        case_sensitive = True
 
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Returns the single cached Settings instance."""
+    return Settings()
 
-# Create a single settings instance to be used throughout the application
-settings = Settings()
 
-# Dynamically adjust service URLs if running in Docker
-if settings.IS_DOCKER:
-    settings.DISCOVERY_SERVICE_URL = "http://discovery-service:8001/discover"
-    settings.EXECUTION_AGENT_URL = "http://execution-agent:8004/execute-step"
-    settings.REPORTING_SERVICE_URL = "http://reporting-service:8002"
\ No newline at end of file
+# Single settings instance to be used throughout the application
+settings = get_settings()
@@ -1,13 +1,38 @@
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from api import routes
 from core.config import settings
+from services import http_client, messaging_service
+
+# --- Non-blocking logging ---
+# Request handlers only enqueue records; the QueueListener thread does the
+# formatting and stream writes so log I/O never stalls the event loop.
+_log_queue: queue.SimpleQueue = queue.SimpleQueue()
+_log_listener = QueueListener(
+    _log_queue, logging.StreamHandler(), respect_handler_level=True
+)
+
+
+def setup_queue_logging():
+    """Routes the root logger through the background queue listener."""
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(QueueHandler(_log_queue))
+    root.setLevel(logging.INFO)
+    _log_listener.start()
 
 # --- Initialize FastAPI ---
 app = FastAPI(
     title="iQAP AI Orchestrator",
     description="An AI-powered service to orchestrate the generation of automated test cases.",
     version="1.0.0",
+    default_response_class=ORJSONResponse,
 )
 
 # --- CORS Middleware ---
@@ -21,3 +46,17 @@ app.add_middleware(
 
 # --- Include API Routes ---
 app.include_router(routes.router, prefix="/api/v1")
+
+
+@app.on_event("startup")
+async def startup_event():
+    """Moves log formatting and writes off the request hot path."""
+    setup_queue_logging()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Closes the shared HTTP client and RabbitMQ publisher connection."""
+    await http_client.close()
+    await messaging_service.close()
+    _log_listener.stop()
@@ -0,0 +1,31 @@
+"""msgspec schemas for the Discovery Service UI blueprint wire format."""
+
+import msgspec
+
+
+class Element(msgspec.Struct):
+    """A single interactive element reported by the Discovery Service."""
+
+    logical_name: str | None = None
+    tag: str | None = None
+    text: str | None = None
+    id: str | None = None
+    name: str | None = None
+    placeholder: str | None = None
+    aria_label: str | None = None
+    role: str | None = None
+    data_test: str | None = None
+
+
+class Blueprint(msgspec.Struct):
+    """The full UI blueprint returned by the Discovery Service."""
+
+    url: str | None = None
+    elements: list[Element] = msgspec.field(default_factory=list)
+
+
+# Module-level codec instances so the typed decoder/encoder are built once,
+# not per request. Decoding straight into structs skips the intermediate
+# dict materialization that json.loads/response.json() would perform.
+blueprint_decoder = msgspec.json.Decoder(Blueprint)
+blueprint_encoder = msgspec.json.Encoder()
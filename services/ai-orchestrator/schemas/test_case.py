@@ -1,11 +1,15 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from typing import List, Dict, Any, Optional
 
 class ParameterSet(BaseModel):
+    model_config = ConfigDict(str_strip_whitespace=True)
+
     dataset_name: str
     data: Dict[str, Any]
 
 class JourneyRequest(BaseModel):
+    model_config = ConfigDict(str_strip_whitespace=True)
+
     objective: str
     target_url: str
     is_live_view: bool = False
@@ -1,12 +1,39 @@
+import asyncio
 import logging
-import httpx
+import orjson
+from services import discovery_service
 from services.ai_service import ai_service
+from services.http_client import get_http_client, post_with_retries
 from core.config import settings
 
 logger = logging.getLogger(__name__)
 
 MAX_THINKING_STEPS = 10 # This is the outer loop limit
 
+# Upper bound on history entries included in the planner prompt, so its
+# token cost cannot grow quadratically over a journey. A cycle appends at
+# most ~7 entries (one plan plus an action/observation pair per step of a
+# 3-step plan), so this covers a full worst-case journey; the complete
+# history is always kept in memory and persisted with the final status.
+PROMPT_HISTORY_ENTRIES = MAX_THINKING_STEPS * 7
+
+# Execution responses above this size (the embedded new_blueprint can run
+# to hundreds of KB on element-dense pages) are parsed off the event loop
+# so the GIL-holding decode does not stall other journeys.
+_PARSE_OFFLOAD_BYTES = 100_000
+
+# The execution agent only resolves locators from these element fields;
+# everything else in the blueprint is dead weight on the wire.
+_LOCATOR_FIELDS = ("logical_name", "data_test", "id", "text", "placeholder")
+
+
+def _trim_blueprint_for_execution(elements: list) -> list:
+    """Projects blueprint elements down to the locator fields, dropping empties."""
+    return [
+        {key: element.get(key) for key in _LOCATOR_FIELDS if element.get(key)}
+        for element in elements
+    ]
+
 async def run_agent_journey(journey_request: dict):
     """
     Manages the agentic loop with multi-step planning and stateful discovery.
@@ -22,12 +49,18 @@ async def run_agent_journey(journey_request: dict):
     ui_blueprint = None
     final_visual_status = "N/A"
 
+    # Hoist invariants out of the thinking loop.
+    execution_agent_url = settings.EXECUTION_AGENT_URL
+    is_live_view = journey_request.get("is_live_view", False)
+
     for i in range(MAX_THINKING_STEPS):
         try:
             logger.info(f"--- Agent Thinking Cycle {i+1} ---")
             
-            # 1. THINK: Get the next multi-step plan from the AI
-            plan = ai_service.plan_next_step(objective, history, ui_blueprint)
+            # 1. THINK: Get the next multi-step plan from the AI.
+            plan = await ai_service.plan_next_step(
+                objective, history[-PROMPT_HISTORY_ENTRIES:], ui_blueprint
+            )
             history.append(f"Plan {i+1}: {plan.get('thought')}")
             
             if not plan.get("steps"):
@@ -39,10 +72,7 @@ async def run_agent_journey(journey_request: dict):
 
                 if action == "discover":
                     history.append(f"Action: Discovering UI at {current_url}")
-                    async with httpx.AsyncClient() as client:
-                        response = await client.post(settings.DISCOVERY_SERVICE_URL, json={"url": current_url}, timeout=60.0)
-                        response.raise_for_status()
-                        ui_blueprint = response.json()
+                    ui_blueprint = await discovery_service.get_ui_blueprint(current_url)
                     history.append(f"Observation: Discovered {len(ui_blueprint.get('elements', []))} elements.")
                 
                 elif action == "execute_step":
@@ -56,15 +86,20 @@ async def run_agent_journey(journey_request: dict):
                         "db_run_id": db_run_id,
                         "step": step_details,
                         "target_url": current_url,
-                        "ui_blueprint": ui_blueprint.get("elements", []),
+                        "ui_blueprint": _trim_blueprint_for_execution(ui_blueprint.get("elements", [])),
                         "dataset": dataset,
-                        "is_live_view": journey_request.get("is_live_view", False)
+                        "is_live_view": is_live_view
                     }
 
-                    async with httpx.AsyncClient() as client:
-                        response = await client.post(settings.EXECUTION_AGENT_URL, json=payload, timeout=120.0)
-                        response.raise_for_status()
-                        execution_result = response.json()
+                    response = await post_with_retries(
+                        execution_agent_url, json=payload, timeout=120.0
+                    )
+                    if len(response.content) > _PARSE_OFFLOAD_BYTES:
+                        execution_result = await asyncio.to_thread(
+                            orjson.loads, response.content
+                        )
+                    else:
+                        execution_result = orjson.loads(response.content)
 
                     if execution_result.get("status") == "success":
                         # --- MODIFICATION: Update state from the rich execution result ---
@@ -92,12 +127,18 @@ async def run_agent_journey(journey_request: dict):
     await update_final_status(db_run_id, "FAIL", "FAIL", "Agent exceeded maximum thinking steps.", history)
 
 
-async def update_final_status(db_run_id: int, status: str, visual_status: str, reason: str, history: list):
-    # This function is unchanged
+async def update_final_status(db_run_id: int, status: str, visual_status: str, reason: str, history):
     logger.info(f"Updating final status for run {db_run_id}: {status}, Visual: {visual_status}. Reason: {reason}")
     try:
-        payload = {"status": status, "visual_status": visual_status, "failure_reason": reason}
-        async with httpx.AsyncClient() as client:
-            await client.put(f"{settings.REPORTING_SERVICE_URL}/results/{db_run_id}/final-status", json=payload, timeout=30.0)
+        # The full history travels once, with the terminal write, rather than
+        # as incremental updates during the journey.
+        payload = {
+            "status": status,
+            "visual_status": visual_status,
+            "failure_reason": reason,
+            "history": list(history),
+        }
+        client = get_http_client()
+        await client.put(f"{settings.REPORTING_SERVICE_URL}/results/{db_run_id}/final-status", json=payload, timeout=30.0)
     except Exception as e:
         logger.error(f"Failed to update final status for run {db_run_id}: {e}")
\ No newline at end of file
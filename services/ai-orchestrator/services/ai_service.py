@@ -1,80 +1,43 @@
 """AI Service Module"""
 
-import json
+import asyncio
+import hashlib
 import logging
-from typing import Dict, Any
-import google.generativeai as genai
+import random
+from typing import Dict, Any, Optional, Tuple
+import orjson
+from cachetools import TTLCache
 from core.config import settings
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Memo of the most recently serialized blueprint. The agent re-plans several
+# times against the same blueprint object, so serializing it once per object
+# (instead of once per prompt build) avoids repeated large-string work.
+# The dict itself is kept (and compared with `is`): keying on id() alone
+# would alias a freed address once the blueprint is rebound per step.
+_last_blueprint: Optional[Tuple[dict, str]] = None
 
-class AIService:
-    """
-    A service class to handle interactions with the Google Gemini Pro model for agentic planning.
-    """
+# Column order for the tabular blueprint rendering sent to the model.
+_BLUEPRINT_COLUMNS = (
+    "logical_name", "tag", "text", "id", "name",
+    "placeholder", "aria_label", "role", "data_test",
+)
 
-    def __init__(self, api_key: str, model_name: str, temperature: float):
-        self.model = None
-        if not api_key:
-            raise ValueError(
-                "CRITICAL ERROR: GOOGLE_API_KEY is not set. AI Service cannot start."
-            )
-        try:
-            genai.configure(api_key=api_key)
-            generation_config = {"temperature": temperature}
-            self.model = genai.GenerativeModel(
-                model_name, generation_config=generation_config
-            )
-            logger.info("Successfully configured Gemini Pro model : %s", model_name)
-        except Exception as e:
-            raise RuntimeError(
-                f"CRITICAL ERROR: Failed to configure Gemini API. Error: {e}"
-            )
-
-    def plan_next_step(self, objective: str, history: list, ui_blueprint: str = None) -> Dict[str, Any]:
-        """
-        Analyzes the objective and history to decide the next sequence of actions.
-        """
-        if not self.model:
-            raise RuntimeError("Gemini model is not configured.")
 
-        prompt = self._build_agent_prompt(objective, history, ui_blueprint)
+# Plans for identical inputs are cached for an hour. The model runs at
+# temperature 0.0, so the same objective/history/blueprint always yields the
+# same plan; a cache hit skips the multi-second Gemini round-trip entirely.
+_plan_cache: TTLCache = TTLCache(maxsize=1024, ttl=3600)
 
-        try:
-            logger.info("Calling Gemini API for multi-step planning...")
-            response = self.model.generate_content(prompt)
-            cleaned_response = (
-                response.text.replace("```json", "").replace("```", "").strip()
-            )
-            
-            result = json.loads(cleaned_response)
-            
-            if "steps" in result:
-                logger.info(f"Gemini planned {len(result['steps'])} steps.")
-                return result
-            else:
-                logger.error("Gemini response was valid JSON but missed the required 'steps' key.")
-                raise ValueError("AI failed to generate a valid action plan.")
-
-        except Exception as e:
-            logger.warning(f"Gemini API call or parsing failed: {e}. Raising error.")
-            raise ValueError(f"An error occurred during AI planning: {e}")
-
-    def _build_agent_prompt(self, objective: str, history: list, ui_blueprint: str = None) -> str:
-        """Constructs the prompt for multi-step planning."""
-        
-        history_str = "\n".join(f"- {item}" for item in history)
-        blueprint_str = f"""
-        **Current UI Blueprint:**
-        ```json
-        {ui_blueprint if ui_blueprint else "No UI blueprint available. You must discover the UI first."}
-        ```
-        """
+MAX_GEMINI_ATTEMPTS = 3
 
-        return f"""
+# Static prompt sections, built once at import. Assembling the prompt from
+# these parts means each call only pays for the dynamic pieces (objective,
+# history, blueprint) instead of re-creating the full instruction text.
+_PROMPT_RULES = """
         You are an autonomous QA Agent. Your goal is to test a web application based on a given objective.
         Your task is to generate a JSON object containing a sequence of steps to perform based on the current UI.
 
@@ -84,42 +47,247 @@ class AIService:
         3.  **Handle Hidden Elements:** If your target (e.g., "Logout") is not in the blueprint, your plan should be to click the container element (e.g., a "Menu" button) to reveal it. This click should be the only step in your plan.
         4.  **Declare Completion:** If the objective has been fully met, return a single "finish" step.
         5.  **No Blueprint?:** If no UI blueprint is available, your plan must be a single "discover" step with no parameters.
+        6.  **Blueprint Format:** The UI blueprint is a pipe-delimited table: a header line naming the columns, then one row per element. A blank cell means that attribute is absent.
+"""
 
-        **Objective:** "{objective}"
-
+_PROMPT_ACTIONS = """
         **Action Types:**
-        - `discover`: To scan the current page. (Parameters: {{}})
-        - `execute_step`: To interact with an element. (Parameters: {{ "action": "CLICK" | "ENTER_TEXT", "target_element": "logical_name", ...}})
-        - `finish`: When the entire objective is complete. (Parameters: {{"reason": "summary"}})
-
-        **History of Plans Executed:**
-        {history_str if history_str else "No plans executed yet."}
-
-        {blueprint_str}
+        - `discover`: To scan the current page. (Parameters: {})
+        - `execute_step`: To interact with an element. (Parameters: { "action": "CLICK" | "ENTER_TEXT", "target_element": "logical_name", ...})
+        - `finish`: When the entire objective is complete. (Parameters: {"reason": "summary"})
+"""
 
+_PROMPT_TASK = """
         **Your Task:**
         Generate a single JSON object containing a `thought` and a `steps` array for the next sequence of actions.
 
         **Example 1: Logging In**
-        {{
+        {
           "thought": "The UI shows a login form. I can fill in the username, the password, and then click the login button. The login click will navigate, so it will be the last step.",
           "steps": [
-            {{ "action": "execute_step", "parameters": {{ "action": "ENTER_TEXT", "target_element": "Username", "data_key": "Username" }} }},
-            {{ "action": "execute_step", "parameters": {{ "action": "ENTER_TEXT", "target_element": "Password", "data_key": "Password" }} }},
-            {{ "action": "execute_step", "parameters": {{ "action": "CLICK", "target_element": "Login" }} }}
+            { "action": "execute_step", "parameters": { "action": "ENTER_TEXT", "target_element": "Username", "data_key": "Username" } },
+            { "action": "execute_step", "parameters": { "action": "ENTER_TEXT", "target_element": "Password", "data_key": "Password" } },
+            { "action": "execute_step", "parameters": { "action": "CLICK", "target_element": "Login" } }
           ]
-        }}
+        }
 
         **Example 2: Needing to Discover**
-        {{
+        {
             "thought": "I have no UI information for the current page. I must discover it first.",
             "steps": [
-                {{ "action": "discover", "parameters": {{}} }}
+                { "action": "discover", "parameters": {} }
             ]
-        }}
+        }
+        """
+
+# Precompiled template for the per-call prompt tail; one %-substitution at
+# call time instead of rebuilding the string piecewise.
+_DYNAMIC_PROMPT_TEMPLATE = """        **Objective:** "%s"
+
+        **History of Plans Executed:**
+        %s
+
+        **Current UI Blueprint:**
+        %s
 
         Now, generate the JSON for your next plan.
+"""
+
+# The full static scaffold is registered once as the model's system
+# instruction. Gemini treats the invariant prefix as cacheable context, so
+# each planning call only pays tokens for the dynamic objective/history/
+# blueprint tail.
+_SYSTEM_INSTRUCTION = _PROMPT_RULES + _PROMPT_ACTIONS + _PROMPT_TASK
+
+
+def _extract_json(text: str) -> str:
+    """Extracts the outermost balanced ``{...}`` object from noisy LLM output.
+
+    Gemini occasionally wraps the plan JSON in commentary or leaves stray
+    text after the closing brace; a single O(n) scan with a depth counter
+    (string- and escape-aware) recovers the object without re-prompting.
+    """
+    start = text.find("{")
+    if start == -1:
+        raise ValueError("No JSON object found in AI response.")
+    depth = 0
+    in_string = False
+    escaped = False
+    for index in range(start, len(text)):
+        char = text[index]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char == "{":
+            depth += 1
+        elif char == "}":
+            depth -= 1
+            if depth == 0:
+                return text[start : index + 1]
+    raise ValueError("Unbalanced JSON object in AI response.")
+
+
+def _blueprint_to_table(ui_blueprint: dict) -> str:
+    """Renders a blueprint as a pipe-delimited table, memoizing the last one.
+
+    JSON repeats every field name per element, so a 200-element page pays
+    for ~200 copies of the same nine keys in prompt tokens. The columnar
+    form names each field once in the header and emits one value row per
+    element, with absent attributes left blank.
+    """
+    global _last_blueprint
+    if _last_blueprint is not None and _last_blueprint[0] is ui_blueprint:
+        return _last_blueprint[1]
+    lines = ["UI_ELEMENTS: " + "|".join(_BLUEPRINT_COLUMNS)]
+    for element in ui_blueprint.get("elements", []):
+        values = (
+            str(element.get(column) or "").replace("|", " ").replace("\n", " ")
+            for column in _BLUEPRINT_COLUMNS
+        )
+        lines.append("  " + "|".join(values))
+    text = "\n".join(lines)
+    _last_blueprint = (ui_blueprint, text)
+    return text
+
+
+class AIService:
+    """
+    A service class to handle interactions with the Google Gemini Pro model for agentic planning.
+    """
+
+    def __init__(self, api_key: str, model_name: str, temperature: float):
+        self._api_key = api_key
+        self._model_name = model_name
+        self._temperature = temperature
+        self._model = None
+
+    @property
+    def model(self):
+        """Configures the Gemini SDK lazily on first use.
+
+        Importing and configuring google.generativeai is expensive, so it is
+        deferred out of module import (and worker fork) time.
         """
+        if self._model is None:
+            if not self._api_key:
+                raise ValueError(
+                    "CRITICAL ERROR: GOOGLE_API_KEY is not set. AI Service cannot start."
+                )
+            import google.generativeai as genai
+
+            try:
+                genai.configure(api_key=self._api_key)
+                # Native JSON mode: the model emits valid JSON directly, so
+                # the fence-stripping/brace-scanning paths become rarely-hit
+                # safety nets instead of the norm, and parse-failure retries
+                # (a full LLM round-trip each) drop to ~0. No response_schema:
+                # step parameters are free-form by design.
+                generation_config = {
+                    "temperature": self._temperature,
+                    "response_mime_type": "application/json",
+                }
+                self._model = genai.GenerativeModel(
+                    self._model_name,
+                    generation_config=generation_config,
+                    system_instruction=_SYSTEM_INSTRUCTION,
+                )
+                logger.info(
+                    "Successfully configured Gemini Pro model : %s", self._model_name
+                )
+            except Exception as e:
+                raise RuntimeError(
+                    f"CRITICAL ERROR: Failed to configure Gemini API. Error: {e}"
+                )
+        return self._model
+
+    async def plan_next_step(self, objective: str, history: list, ui_blueprint: dict = None) -> Dict[str, Any]:
+        """
+        Analyzes the objective and history to decide the next sequence of actions.
+        """
+        # Deterministic fast path: with no blueprint, prompt rule 5 admits
+        # exactly one valid plan (a lone discover step), so asking Gemini to
+        # derive it would spend a ~2s round-trip on a foregone conclusion.
+        if not ui_blueprint:
+            logger.info("No blueprint available; returning discover plan without an LLM call.")
+            return {
+                "thought": "I have no UI information for the current page. I must discover it first.",
+                "steps": [{"action": "discover", "parameters": {}}],
+            }
+
+        prompt = self._build_agent_prompt(objective, history, ui_blueprint)
+
+        cache_key = hashlib.blake2b(prompt.encode(), digest_size=16).hexdigest()
+        cached_plan = _plan_cache.get(cache_key)
+        if cached_plan is not None:
+            logger.info("Returning cached plan for identical planning inputs.")
+            return cached_plan
+
+        model = self.model
+        # The async SDK call keeps the event loop free for the full LLM
+        # latency; jittered backoff avoids a thundering herd against Gemini
+        # when several journeys retry at once.
+        for attempt in range(MAX_GEMINI_ATTEMPTS):
+            try:
+                logger.info("Calling Gemini API for multi-step planning...")
+                response = await model.generate_content_async(prompt)
+                # removeprefix/removesuffix only inspect the string ends,
+                # unlike .replace which scans the whole response twice.
+                cleaned_response = (
+                    response.text.strip()
+                    .removeprefix("```json")
+                    .removeprefix("```")
+                    .removesuffix("```")
+                    .strip()
+                )
+
+                try:
+                    result = orjson.loads(cleaned_response)
+                except orjson.JSONDecodeError:
+                    # Fence stripping was not enough; salvage the outermost
+                    # balanced object before burning a retry attempt.
+                    result = orjson.loads(_extract_json(response.text))
+
+                if "steps" in result:
+                    logger.info(f"Gemini planned {len(result['steps'])} steps.")
+                    _plan_cache[cache_key] = result
+                    return result
+                else:
+                    logger.error("Gemini response was valid JSON but missed the required 'steps' key.")
+                    raise ValueError("AI failed to generate a valid action plan.")
+
+            except Exception as e:
+                if attempt + 1 >= MAX_GEMINI_ATTEMPTS:
+                    logger.warning(f"Gemini API call or parsing failed: {e}. Raising error.")
+                    raise ValueError(f"An error occurred during AI planning: {e}")
+                delay = min(2**attempt, 8) + random.random() * 0.5
+                logger.warning(
+                    "Gemini call failed (attempt %d/%d): %s. Retrying in %.1fs...",
+                    attempt + 1, MAX_GEMINI_ATTEMPTS, e, delay,
+                )
+                await asyncio.sleep(delay)
+
+    def _build_agent_prompt(self, objective: str, history: list, ui_blueprint: dict = None) -> str:
+        """Constructs the prompt for multi-step planning."""
+
+        history_str = "\n".join(f"- {item}" for item in history)
+        blueprint_str = (
+            _blueprint_to_table(ui_blueprint)
+            if ui_blueprint
+            else "No UI blueprint available. You must discover the UI first."
+        )
+        # Only the dynamic tail is sent per call; the rules, action types and
+        # examples live in the model's system instruction.
+        return _DYNAMIC_PROMPT_TEMPLATE % (
+            objective,
+            history_str if history_str else "No plans executed yet.",
+            blueprint_str,
+        )
 
 # Create a single instance of the AI service to be reused
 ai_service = AIService(
@@ -1,28 +1,49 @@
 """Discovery Service Client"""
 
 import httpx
-import json
 import logging
+import msgspec
+from cachetools import TTLCache
 from fastapi import HTTPException
 from core.config import settings
+from schemas.blueprint import blueprint_decoder
+from services.http_client import get_http_client
 
 logger = logging.getLogger(__name__)
 
+# Discovery renders the full page in a browser (up to 60 s), but blueprints
+# for a given URL rarely change between consecutive CI runs. Cache them for a
+# short window; purge_blueprint_cache lets callers invalidate on deploys.
+_blueprint_cache: TTLCache = TTLCache(maxsize=128, ttl=300)
 
-async def get_ui_blueprint(url: str) -> str:
+
+async def get_ui_blueprint(url: str) -> dict:
     """
     Contacts the Discovery Service to get the UI blueprint for a given URL.
     """
+    cached = _blueprint_cache.get(url)
+    if cached is not None:
+        logger.info("Returning cached blueprint for %s", url)
+        return cached
+
     logger.info("Contacting Discovery Service at %s", settings.DISCOVERY_SERVICE_URL)
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                settings.DISCOVERY_SERVICE_URL, json={"url": url}, timeout=60.0
-            )
+        client = get_http_client()
+        # Stream the response into one buffer instead of letting httpx
+        # assemble an intermediate immutable bytes body, then decode the
+        # buffer straight into the typed schema in a single pass.
+        buffer = bytearray()
+        async with client.stream(
+            "POST", settings.DISCOVERY_SERVICE_URL, json={"url": url}, timeout=60.0
+        ) as response:
             response.raise_for_status()
-            logger.info("Discovery Service returned blueprint successfully.")
-            # Ensure the output is a compact JSON string
-            return json.dumps(response.json())
+            async for chunk in response.aiter_bytes():
+                buffer += chunk
+        logger.info("Discovery Service returned blueprint successfully.")
+        blueprint = blueprint_decoder.decode(buffer)
+        result = msgspec.to_builtins(blueprint)
+        _blueprint_cache[url] = result
+        return result
     except httpx.RequestError as e:
         logger.error(f"Error contacting Discovery Service: {e}")
         raise HTTPException(status_code=503, detail="Discovery Service unavailable.")
@@ -31,3 +52,9 @@ async def get_ui_blueprint(url: str) -> str:
         raise HTTPException(
             status_code=e.response.status_code, detail="Error from Discovery Service."
         )
+
+
+def purge_blueprint_cache():
+    """Clears all cached blueprints (e.g. after a deploy changes the UI)."""
+    _blueprint_cache.clear()
+    logger.info("Blueprint cache purged.")
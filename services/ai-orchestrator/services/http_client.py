@@ -0,0 +1,80 @@
+"""Shared HTTP Client"""
+
+import httpx
+from tenacity import (
+    AsyncRetrying,
+    retry_if_exception,
+    stop_after_attempt,
+    wait_exponential_jitter,
+)
+
+# A single AsyncClient shared across the service so outbound calls to the
+# reporting, discovery and execution services reuse pooled keep-alive
+# connections instead of paying a TCP handshake on every request.
+_client: httpx.AsyncClient | None = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Returns the shared AsyncClient, creating it on first use."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            http2=True,
+            timeout=60.0,
+            limits=httpx.Limits(
+                max_keepalive_connections=64,
+                max_connections=128,
+                # Idle connections survive the gaps between thinking cycles
+                # (Gemini calls routinely take tens of seconds), so the next
+                # step dispatch reuses a warm stream instead of redialing.
+                keepalive_expiry=60.0,
+            ),
+        )
+    return _client
+
+
+def _is_retryable(exc: BaseException) -> bool:
+    """Transport failures and 5xx responses are transient; 4xx are not."""
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code >= 500
+    return isinstance(exc, httpx.TransportError)
+
+
+def _is_connect_failure(exc: BaseException) -> bool:
+    """True only when the request provably never reached the server."""
+    return isinstance(exc, (httpx.ConnectError, httpx.ConnectTimeout))
+
+
+async def post_with_retries(
+    url: str, *, json=None, timeout=None, attempts: int = 3, idempotent: bool = False
+) -> httpx.Response:
+    """
+    POSTs via the shared client, retrying transient failures with jittered
+    exponential backoff so a single 502 from a peer service does not sink a
+    whole journey (and the Gemini spend behind it).
+
+    By default only connection-establishment failures are retried: a
+    ReadTimeout on a side-effecting call (an /execute-step CLICK, say) may
+    mean the action already ran, and re-POSTing it would double-apply.
+    Callers whose POST is safe to replay opt in with idempotent=True to
+    also retry timeouts and 5xx responses.
+    """
+    client = get_http_client()
+    async for attempt in AsyncRetrying(
+        stop=stop_after_attempt(attempts),
+        wait=wait_exponential_jitter(initial=1, max=8),
+        retry=retry_if_exception(_is_retryable if idempotent else _is_connect_failure),
+        reraise=True,
+    ):
+        with attempt:
+            response = await client.post(url, json=json, timeout=timeout)
+            response.raise_for_status()
+            return response
+
+
+async def close():
+    """Closes the shared client on application shutdown."""
+    global _client
+    if _client is not None and not _client.is_closed:
+        await _client.aclose()
+    _client = None
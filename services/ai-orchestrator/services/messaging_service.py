@@ -1,38 +1,101 @@
 """Messaging Service Client"""
 
-import json
+import asyncio
 import logging
-import pika
+import aio_pika
+import orjson
 from fastapi import HTTPException
 from core.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Long-lived connection/channel shared by all publishes. Opening a fresh
+# AMQP connection per message costs a TCP handshake plus a synchronous
+# queue_declare round-trip, so the publisher is set up once and reused.
+_connection: aio_pika.abc.AbstractRobustConnection | None = None
+_channel: aio_pika.abc.AbstractChannel | None = None
+_channel_lock = asyncio.Lock()
 
-def publish_to_rabbitmq(message: dict):
+# Backpressure: bound the number of in-flight publishes so a slow or
+# unreachable broker cannot pile up unbounded pending messages in memory.
+_publish_semaphore = asyncio.Semaphore(64)
+
+# Resolved once instead of per publish on the hot path.
+_PERSISTENT = aio_pika.DeliveryMode.PERSISTENT
+
+
+async def _get_channel() -> aio_pika.abc.AbstractChannel:
+    """Returns the shared publisher channel, connecting on first use."""
+    global _connection, _channel
+    async with _channel_lock:
+        if _channel is None or _channel.is_closed:
+            _connection = await aio_pika.connect_robust(
+                host=settings.RABBITMQ_HOST,
+                login=settings.RABBITMQ_DEFAULT_USER,
+                password=settings.RABBITMQ_DEFAULT_PASS,
+            )
+            _channel = await _connection.channel(publisher_confirms=False)
+            await _channel.declare_queue(settings.RABBITMQ_QUEUE, durable=True)
+            await _channel.set_qos(prefetch_count=settings.RABBITMQ_PREFETCH)
+            logger.info("Opened persistent RabbitMQ publisher channel.")
+        return _channel
+
+
+async def publish_to_rabbitmq(message: dict):
     """
     Publishes a message to the test generation RabbitMQ queue.
     """
     try:
-        credentials = pika.PlainCredentials(
-            settings.RABBITMQ_DEFAULT_USER, settings.RABBITMQ_DEFAULT_PASS
-        )
-        connection = pika.BlockingConnection(
-            pika.ConnectionParameters(
-                host=settings.RABBITMQ_HOST, credentials=credentials
+        async with _publish_semaphore:
+            channel = await _get_channel()
+            await channel.default_exchange.publish(
+                aio_pika.Message(
+                    body=orjson.dumps(message),
+                    delivery_mode=_PERSISTENT,
+                ),
+                routing_key=settings.RABBITMQ_QUEUE,
             )
-        )
-        channel = connection.channel()
-        channel.queue_declare(queue=settings.RABBITMQ_QUEUE, durable=True)
-
-        channel.basic_publish(
-            exchange="",
-            routing_key=settings.RABBITMQ_QUEUE,
-            body=json.dumps(message),
-            properties=pika.BasicProperties(delivery_mode=2),  # make message persistent
-        )
-        connection.close()
         logger.info(f"Sent job to RabbitMQ: {message.get('test_case_id')}")
-    except pika.exceptions.AMQPConnectionError as e:
+    except aio_pika.exceptions.AMQPConnectionError as e:
         logger.error(f"Failed to connect to RabbitMQ: {e}")
         raise HTTPException(status_code=503, detail="Messaging service unavailable.")
+
+
+async def publish_batch_to_rabbitmq(messages: list[dict]):
+    """
+    Publishes a batch of messages on the shared channel in one gather.
+
+    The channel runs without per-message publisher confirms, so the acks
+    never sit on the critical path; publishing N messages costs roughly
+    one socket flush instead of N round-trips.
+    """
+    if not messages:
+        return
+    try:
+        async with _publish_semaphore:
+            channel = await _get_channel()
+            await asyncio.gather(
+                *(
+                    channel.default_exchange.publish(
+                        aio_pika.Message(
+                            body=orjson.dumps(message),
+                            delivery_mode=_PERSISTENT,
+                        ),
+                        routing_key=settings.RABBITMQ_QUEUE,
+                    )
+                    for message in messages
+                )
+            )
+        logger.info(f"Sent batch of {len(messages)} jobs to RabbitMQ.")
+    except aio_pika.exceptions.AMQPConnectionError as e:
+        logger.error(f"Failed to connect to RabbitMQ: {e}")
+        raise HTTPException(status_code=503, detail="Messaging service unavailable.")
+
+
+async def close():
+    """Closes the shared publisher connection on application shutdown."""
+    global _connection, _channel
+    if _connection is not None:
+        await _connection.close()
+        _connection = None
+        _channel = None
@@ -1,13 +1,23 @@
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
 from fastapi import APIRouter, HTTPException
+from core.config import settings
 from core.executor import execute_single_step
 from pydantic import BaseModel
 from typing import Dict, Any, List
-from multiprocessing import Process, Queue
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+# Steps run on dedicated worker threads so the executor's persistent
+# browsers (sync Playwright objects are bound to their creating thread,
+# hence one browser per worker) survive across requests instead of being
+# relaunched per step. Pool size bounds parallel browser work.
+_step_worker = ThreadPoolExecutor(
+    max_workers=settings.EXEC_CONCURRENCY, thread_name_prefix="step-exec"
+)
+
 class StepExecutionRequest(BaseModel):
     db_run_id: int
     step: Dict[str, Any]
@@ -16,36 +26,21 @@ class StepExecutionRequest(BaseModel):
     dataset: Dict[str, Any]
     is_live_view: bool
 
-def process_target(queue, request):
-    """This function runs in the new process."""
-    result = execute_single_step(request)
-    queue.put(result)
-
 @router.post("/execute-step")
 def execute_step_endpoint(request: StepExecutionRequest):
     """
-    Receives a single step, executes it in a separate process to ensure
-    complete isolation from the asyncio event loop, and returns the result.
+    Receives a single step and runs it on the dedicated executor thread,
+    keeping Playwright off the asyncio event loop while reusing the
+    persistent browser between steps.
     """
-    logger.info(f"Spawning new process for step: {request.step}")
-    
-    try:
-        # A Queue is used to get the return value from the separate process
-        result_queue = Queue()
+    logger.info(f"Dispatching step to executor thread: {request.step}")
 
-        # Create and start the process
-        process = Process(target=process_target, args=(result_queue, request))
-        process.start()
-        process.join(timeout=120) # Wait for the process to finish, with a timeout
-
-        if process.is_alive():
-            process.terminate()
-            raise HTTPException(status_code=500, detail="Step execution timed out.")
-
-        # Get the result from the queue
-        result = result_queue.get()
-        return result
+    try:
+        future = _step_worker.submit(execute_single_step, request)
+        return future.result(timeout=120)
 
+    except FutureTimeoutError:
+        raise HTTPException(status_code=500, detail="Step execution timed out.")
     except Exception as e:
         logger.error(f"Error managing execution process: {e}", exc_info=True)
         return {
@@ -5,7 +5,6 @@ load_dotenv()
 
 class Settings:
     IS_DOCKER = os.environ.get("DOCKER_ENV") == "true"
-    IS_LIVE_VIEW = False # This will be set per-request
 
     MINIO_HOST = "minio:9000" if IS_DOCKER else os.getenv("MINIO_HOST", "localhost:9000")
     MINIO_ACCESS_KEY = os.getenv("MINIO_ROOT_USER")
@@ -13,4 +12,11 @@ class Settings:
     
     REALTIME_SERVICE_URL = "http://realtime-service:8003" if IS_DOCKER else os.getenv("REALTIME_SERVICE_URL", "http://localhost:8003")
 
+    # When set (e.g. http://chromium:9222), the agent attaches to a shared
+    # Chromium over CDP instead of launching its own; empty means local launch.
+    CDP_ENDPOINT = os.getenv("CDP_ENDPOINT", "")
+
+    # How many steps may execute in parallel (one worker thread each).
+    EXEC_CONCURRENCY = int(os.getenv("EXEC_CONCURRENCY", "4"))
+
 settings = Settings()
\ No newline at end of file
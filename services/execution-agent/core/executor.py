@@ -1,14 +1,22 @@
 import os
 import io
 import re
+import socket
 import time
 import json
+import threading
+from urllib.parse import urlsplit, urlunsplit
 import httpx
 from minio import Minio
 from minio.error import S3Error
 from playwright.sync_api import sync_playwright, expect, Error as PlaywrightError
 from .config import settings
 
+# Hoisted out of the hot path: compiled once at import instead of re-parsed
+# per failure, and the selector no longer rebuilt per discovery pass.
+_WS_RE = re.compile(r"\s+")
+INTERACTIVE_ELEMENTS = 'button, a, input, select, textarea, [role="button"], [role="link"]'
+
 # --- MinIO Client Initialization ---
 try:
     minio_client = Minio(
@@ -22,19 +30,85 @@ except Exception as e:
     print(f"Execution Agent: CRITICAL - Failed to initialize MinIO client: {e}")
     minio_client = None
 
+# --- Browser Lifecycle ---
+# Browsers stay alive for the process lifetime; each step gets a fresh
+# BrowserContext (cookie/storage isolated, ~100x cheaper than a launch).
+# Sync Playwright objects are bound to the thread that created them, so the
+# state is thread-local: each of the API layer's worker threads keeps its
+# own Playwright instance and browser connection.
+_thread_state = threading.local()
+
+
+def _get_playwright():
+    if getattr(_thread_state, "playwright", None) is None:
+        _thread_state.playwright = sync_playwright().start()
+    return _thread_state.playwright
+
+
+def _default_launch_args():
+    if settings.IS_DOCKER:
+        return ["--no-sandbox", "--disable-setuid-sandbox", "--disable-dev-shm-usage"]
+    return []
+
+
+def _resolve_cdp_endpoint(endpoint: str) -> str:
+    """Rewrites the endpoint's hostname to an IP literal.
+
+    Chrome's DevTools HTTP server rejects any Host header that is not an
+    IP address or localhost, so http://chromium:9222 must be dialed by the
+    sidecar's resolved IP. Resolved on every (re)attach, since container
+    IPs change across restarts.
+    """
+    parts = urlsplit(endpoint)
+    host = parts.hostname
+    if not host or host == "localhost":
+        return endpoint
+    ip = socket.gethostbyname(host)  # returns IP literals unchanged
+    netloc = ip if parts.port is None else f"{ip}:{parts.port}"
+    return urlunsplit((parts.scheme, netloc, parts.path, parts.query, parts.fragment))
+
+
+def _get_browser():
+    """Returns the shared headless browser, reattaching/relaunching if it died.
+
+    With CDP_ENDPOINT set, the agent attaches to an external Chromium over
+    CDP so several agent replicas can multiplex one browser process; each
+    step still gets its own context for cookie/storage isolation.
+    """
+    browser = getattr(_thread_state, "browser", None)
+    if browser is None or not browser.is_connected():
+        if settings.CDP_ENDPOINT:
+            endpoint = _resolve_cdp_endpoint(settings.CDP_ENDPOINT)
+            browser = _get_playwright().chromium.connect_over_cdp(endpoint)
+            print(f"Execution Agent: Attached to shared Chromium at {endpoint}.")
+        else:
+            browser = _get_playwright().chromium.launch(
+                headless=True, args=_default_launch_args()
+            )
+            print("Execution Agent: Launched headless Chromium for this worker.")
+        _thread_state.browser = browser
+    return browser
+
+
 # --- Helper Functions ---
-def send_realtime_update(run_id: int, update: dict):
-    if not run_id or not settings.IS_LIVE_VIEW:
+# Module-level client so step updates ride one keep-alive connection to the
+# realtime service instead of paying a TCP handshake per POST.
+_realtime_client = httpx.Client(
+    base_url=settings.REALTIME_SERVICE_URL,
+    timeout=5.0,
+    limits=httpx.Limits(max_keepalive_connections=8),
+)
+
+def send_realtime_update(run_id: int, update: dict, is_live_view: bool):
+    if not run_id or not is_live_view:
         return
     try:
-        httpx.post(f"{settings.REALTIME_SERVICE_URL}/update/{run_id}", json=update, timeout=5)
+        _realtime_client.post(f"/update/{run_id}", json=update)
     except httpx.RequestError as e:
         print(f"  [Realtime] Could not send update for run {run_id}: {e}")
 
 def get_interactive_elements(page):
     elements = []
-    # This selector is now defined locally
-    INTERACTIVE_ELEMENTS = 'button, a, input, select, textarea, [role="button"], [role="link"]'
     locators = page.locator(INTERACTIVE_ELEMENTS)
     for i in range(locators.count()):
         locator = locators.nth(i)
@@ -60,8 +134,12 @@ def get_interactive_elements(page):
             continue
     return elements
 
-def find_element_locator(page, target_name: str, ui_blueprint: list):
-    element_data = next((el for el in ui_blueprint if el.get("logical_name") == target_name), None)
+def build_blueprint_index(ui_blueprint: list) -> dict:
+    """Indexes blueprint elements by logical name for O(1) step lookups."""
+    return {el["logical_name"]: el for el in ui_blueprint if el.get("logical_name")}
+
+def find_element_locator(page, target_name: str, blueprint_index: dict):
+    element_data = blueprint_index.get(target_name)
     if not element_data:
         raise ValueError(f"Logical name '{target_name}' not found in UI blueprint.")
     if element_data.get("data_test"): return page.locator(f"[data-test='{element_data['data_test']}']")
@@ -73,47 +151,61 @@ def find_element_locator(page, target_name: str, ui_blueprint: list):
 # --- Main Executor Logic ---
 def execute_single_step(request):
     step = request.step
-    settings.IS_LIVE_VIEW = request.is_live_view
+    # Kept local: steps from different journeys share this process, so a
+    # settings-level flag would race between concurrent worker threads.
+    is_live_view = request.is_live_view
 
-    with sync_playwright() as p:
-        browser = None
-        try:
-            launch_options = {"headless": not settings.IS_LIVE_VIEW, "slow_mo": 50 if settings.IS_LIVE_VIEW else 0}
-            if settings.IS_DOCKER:
-                launch_options["args"] = ["--no-sandbox", "--disable-setuid-sandbox", "--disable-dev-shm-usage"]
-            
-            browser = p.chromium.launch(**launch_options)
-            page = browser.new_page()
-            page.goto(request.target_url, timeout=60000)
-
-            send_realtime_update(request.db_run_id, {"type": "step_result", "step": step.get("step_number", 0), "status": "RUNNING"})
-
-            action = step.get("action")
-            target_name = step.get("target_element")
-
-            element_locator = find_element_locator(page, target_name, request.ui_blueprint)
-            expect(element_locator).to_be_visible(timeout=10000)
-            if action == "ENTER_TEXT":
-                data_key = step.get("data_key")
-                data_to_use = request.dataset.get(data_key, "")
-                element_locator.fill(data_to_use)
-            elif action == "CLICK":
-                element_locator.click()
-                # Wait for potential navigation or dynamic content
-                page.wait_for_load_state("domcontentloaded", timeout=5000)
-
-            send_realtime_update(request.db_run_id, {"type": "step_result", "step": step.get("step_number", 0), "status": "PASS"})
-            
-            final_url = page.url
-            
-            new_elements = get_interactive_elements(page)
-            new_blueprint = {"url": final_url, "elements": new_elements}
-            
-            browser.close()
-            return {"status": "success", "new_url": final_url, "new_blueprint": new_blueprint}
-
-        except (PlaywrightError, ValueError) as e:
-            reason = re.sub(r"\s+", " ", str(e).splitlines()[0])
-            if browser:
-                browser.close()
-            return {"status": "fail", "new_url": request.target_url, "reason": reason}
\ No newline at end of file
+    ephemeral_browser = None
+    context = None
+    try:
+        if is_live_view:
+            # A headed, slowed-down browser cannot be served from the shared
+            # headless instance, so live view keeps the launch-per-step path.
+            ephemeral_browser = _get_playwright().chromium.launch(
+                headless=False, slow_mo=50, args=_default_launch_args()
+            )
+            context = ephemeral_browser.new_context()
+        else:
+            context = _get_browser().new_context()
+
+        page = context.new_page()
+        # domcontentloaded instead of the default "load": the visibility
+        # expectation below is the real readiness anchor, so there is no
+        # need to wait for every image/font before acting.
+        page.goto(request.target_url, timeout=60000, wait_until="domcontentloaded")
+
+        send_realtime_update(request.db_run_id, {"type": "step_result", "step": step.get("step_number", 0), "status": "RUNNING"}, is_live_view)
+
+        action = step.get("action")
+        target_name = step.get("target_element")
+
+        element_locator = find_element_locator(
+            page, target_name, build_blueprint_index(request.ui_blueprint)
+        )
+        expect(element_locator).to_be_visible(timeout=10000)
+        if action == "ENTER_TEXT":
+            data_key = step.get("data_key")
+            data_to_use = request.dataset.get(data_key, "")
+            element_locator.fill(data_to_use)
+        elif action == "CLICK":
+            element_locator.click()
+            # Wait for potential navigation or dynamic content
+            page.wait_for_load_state("domcontentloaded", timeout=5000)
+
+        send_realtime_update(request.db_run_id, {"type": "step_result", "step": step.get("step_number", 0), "status": "PASS"}, is_live_view)
+
+        final_url = page.url
+
+        new_elements = get_interactive_elements(page)
+        new_blueprint = {"url": final_url, "elements": new_elements}
+
+        return {"status": "success", "new_url": final_url, "new_blueprint": new_blueprint}
+
+    except (PlaywrightError, ValueError) as e:
+        reason = _WS_RE.sub(" ", str(e).splitlines()[0])
+        return {"status": "fail", "new_url": request.target_url, "reason": reason}
+    finally:
+        if context:
+            context.close()
+        if ephemeral_browser:
+            ephemeral_browser.close()
\ No newline at end of file
@@ -6,7 +6,8 @@ import httpx
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from psycopg2.extras import RealDictCursor
+from psycopg2.extras import Json, RealDictCursor, execute_values
+from psycopg2.pool import ThreadedConnectionPool
 from dotenv import load_dotenv
 from collections import defaultdict
 from datetime import date, timedelta
@@ -28,43 +29,67 @@ DB_USER = os.getenv("POSTGRES_USER")
 DB_PASS = os.getenv("POSTGRES_PASSWORD")
 DB_PORT = os.getenv("POSTGRES_PORT", "5432")
 
+# Shared connection pool, created once the database is reachable. Borrowing
+# from the pool avoids the TCP + auth + backend-fork cost of a fresh
+# psycopg2.connect() on every request.
+db_pool: Optional[ThreadedConnectionPool] = None
+
+def _init_db_schema():
+    """Connects to PostgreSQL and ensures the test_results table exists.
+
+    This is a blocking psycopg2 call; the lifespan handler runs it in a
+    thread so the event loop stays free during startup retries.
+    """
+    conn = psycopg2.connect(
+        dbname=DB_NAME, user=DB_USER, password=DB_PASS, host=DB_HOST
+    )
+    try:
+        print("Reporting Service: Successfully connected to PostgreSQL.")
+        cursor = conn.cursor()
+        cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS test_results (
+                id SERIAL PRIMARY KEY,
+                test_case_id VARCHAR(255),
+                objective TEXT,
+                status VARCHAR(50),
+                visual_status VARCHAR(50),
+                timestamp TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+                failure_reason TEXT,
+                artifacts_path VARCHAR(255),
+                visual_artifacts JSONB,
+                history JSONB
+            );
+            """
+        )
+        cursor.execute(
+            "SELECT column_name FROM information_schema.columns WHERE table_name='test_results' AND column_name='visual_artifacts'"
+        )
+        if cursor.fetchone() is None:
+            cursor.execute(
+                "ALTER TABLE test_results ADD COLUMN visual_artifacts JSONB;"
+            )
+        cursor.execute(
+            "SELECT column_name FROM information_schema.columns WHERE table_name='test_results' AND column_name='history'"
+        )
+        if cursor.fetchone() is None:
+            cursor.execute(
+                "ALTER TABLE test_results ADD COLUMN history JSONB;"
+            )
+        conn.commit()
+        cursor.close()
+        print("Reporting Service: Database table 'test_results' is ready.")
+    finally:
+        conn.close()
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    global db_pool
     print("Reporting Service: Lifespan startup event...")
-    conn = None
     while True:
         try:
             print("Reporting Service: Attempting to connect to PostgreSQL...")
-            conn = psycopg2.connect(
-                dbname=DB_NAME, user=DB_USER, password=DB_PASS, host=DB_HOST
-            )
-            print("Reporting Service: Successfully connected to PostgreSQL.")
-            cursor = conn.cursor()
-            cursor.execute(
-                """
-                CREATE TABLE IF NOT EXISTS test_results (
-                    id SERIAL PRIMARY KEY,
-                    test_case_id VARCHAR(255),
-                    objective TEXT,
-                    status VARCHAR(50),
-                    visual_status VARCHAR(50),
-                    timestamp TIMESTAMPTZ NOT NULL DEFAULT NOW(),
-                    failure_reason TEXT,
-                    artifacts_path VARCHAR(255),
-                    visual_artifacts JSONB
-                );
-                """
-            )
-            cursor.execute(
-                "SELECT column_name FROM information_schema.columns WHERE table_name='test_results' AND column_name='visual_artifacts'"
-            )
-            if cursor.fetchone() is None:
-                cursor.execute(
-                    "ALTER TABLE test_results ADD COLUMN visual_artifacts JSONB;"
-                )
-            conn.commit()
-            cursor.close()
-            print("Reporting Service: Database table 'test_results' is ready.")
+            await asyncio.to_thread(_init_db_schema)
             break
         except psycopg2.OperationalError:
             print("Reporting Service: PostgreSQL not ready yet. Waiting 5 seconds to retry...")
@@ -72,11 +97,15 @@ async def lifespan(app: FastAPI):
         except Exception as e:
             print(f"CRITICAL ERROR during startup: Could not initialize database table. {e}")
             await asyncio.sleep(5)
-        finally:
-            if conn is not None:
-                conn.close()
+    db_pool = ThreadedConnectionPool(
+        minconn=1, maxconn=10,
+        dbname=DB_NAME, user=DB_USER, password=DB_PASS, host=DB_HOST, port=DB_PORT,
+    )
+    print("Reporting Service: Database connection pool is ready.")
     yield
     print("Reporting Service: Lifespan shutdown event...")
+    if db_pool is not None:
+        db_pool.closeall()
 
 
 app = FastAPI(lifespan=lifespan)
@@ -98,15 +127,25 @@ class FinalStatusRequest(BaseModel):
     status: str
     visual_status: str
     failure_reason: Optional[str] = None
+    history: Optional[List[str]] = None
 
 # --- Helper Functions ---
 def get_db_connection():
     try:
+        if db_pool is not None:
+            return db_pool.getconn()
         conn = psycopg2.connect(dbname=DB_NAME, user=DB_USER, password=DB_PASS, host=DB_HOST, port=DB_PORT)
         return conn
     except psycopg2.OperationalError as e:
         raise HTTPException(status_code=503, detail="Database service is unavailable.")
 
+def release_db_connection(conn):
+    """Returns a connection to the pool (or closes it if the pool is gone)."""
+    if db_pool is not None:
+        db_pool.putconn(conn)
+    else:
+        conn.close()
+
 def process_daily_summary(rows, days):
     today = date.today()
     date_range = [today - timedelta(days=i) for i in range(days - 1, -1, -1)]
@@ -131,7 +170,7 @@ def get_test_results():
         cursor.close()
         return results
     finally:
-        if conn is not None: conn.close()
+        if conn is not None: release_db_connection(conn)
 
 @app.get("/results/{run_id}")
 def get_run_details(run_id: int):
@@ -145,7 +184,7 @@ def get_run_details(run_id: int):
         if not result: raise HTTPException(status_code=404, detail=f"Test run with ID {run_id} not found.")
         return result
     finally:
-        if conn is not None: conn.close()
+        if conn is not None: release_db_connection(conn)
 
 @app.post("/results", status_code=201)
 def create_initial_run(request: InitialRunRequest):
@@ -164,7 +203,31 @@ def create_initial_run(request: InitialRunRequest):
         cursor.close()
         return new_record
     finally:
-        if conn is not None: conn.close()
+        if conn is not None: release_db_connection(conn)
+
+@app.post("/results/batch", status_code=201)
+def create_initial_runs(requests: List[InitialRunRequest]):
+    """Creates N initial run records in a single INSERT round-trip."""
+    conn = None
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor(cursor_factory=RealDictCursor)
+        rows = []
+        for request in requests:
+            objective = request.objective
+            if request.parameters:
+                dataset_name = request.parameters[0].get("dataset_name", "default")
+                objective += f" ({dataset_name})"
+            rows.append((objective, request.test_case_id))
+        sql = "INSERT INTO test_results (objective, test_case_id, status, visual_status) VALUES %s RETURNING *;"
+        new_records = execute_values(
+            cursor, sql, rows, template="(%s, %s, 'RUNNING', 'N/A')", fetch=True
+        )
+        conn.commit()
+        cursor.close()
+        return new_records
+    finally:
+        if conn is not None: release_db_connection(conn)
 
 @app.put("/results/{run_id}/final-status")
 def update_final_run_status(run_id: int, request: FinalStatusRequest):
@@ -172,13 +235,16 @@ def update_final_run_status(run_id: int, request: FinalStatusRequest):
     try:
         conn = get_db_connection()
         cursor = conn.cursor(cursor_factory=RealDictCursor)
+        # The orchestrator sends the full agent history with this terminal
+        # update, so the whole journey is persisted in one write.
         sql = """
             UPDATE test_results
-            SET status = %s, visual_status = %s, failure_reason = %s
+            SET status = %s, visual_status = %s, failure_reason = %s, history = %s
             WHERE id = %s
             RETURNING *;
         """
-        cursor.execute(sql, (request.status, request.visual_status, request.failure_reason, run_id))
+        history_json = Json(request.history) if request.history is not None else None
+        cursor.execute(sql, (request.status, request.visual_status, request.failure_reason, history_json, run_id))
         updated_record = cursor.fetchone()
         conn.commit()
         cursor.close()
@@ -197,7 +263,7 @@ def update_final_run_status(run_id: int, request: FinalStatusRequest):
         raise HTTPException(status_code=500, detail="Failed to update final status.")
     finally:
         if conn is not None:
-            conn.close()
+            release_db_connection(conn)
 
 @app.get("/stats/kpis")
 def get_kpis(days: int = 7):
@@ -223,7 +289,7 @@ def get_kpis(days: int = 7):
         print(f"ERROR fetching KPIs: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch KPIs.")
     finally:
-        if conn is not None: conn.close()
+        if conn is not None: release_db_connection(conn)
 
 @app.get("/stats/daily_summary")
 def get_daily_summary(days: int = 7):
@@ -251,7 +317,7 @@ def get_daily_summary(days: int = 7):
         print(f"ERROR fetching daily summary: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch daily summary.")
     finally:
-        if conn is not None: conn.close()
+        if conn is not None: release_db_connection(conn)
 
 @app.get("/")
 def read_root():